@@ -1,8 +1,30 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizeGrip
-from PyQt5.QtCore import Qt, QMimeData, pyqtSignal, QPoint, QSize
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QSizeGrip
+from PyQt5.QtCore import Qt, QMimeData, pyqtSignal, QPoint, QSize, QRectF
 from PyQt5.QtGui import QDrag, QPixmap, QPainter, QColor, QPen
 import logging
 
+logger = logging.getLogger(__name__)
+
+# Application-wide stylesheet shared by every panel. Installed once by the
+# extension so Qt parses it a single time for all columns. The panel border
+# is drawn in paintEvent so hover and drop highlighting only need a repaint.
+PANEL_STYLESHEET = """
+    DragDropPanelWidget {
+        background-color: #2a2a2a;
+        border-radius: 4px;
+    }
+    DragDropPanelWidget QLabel {
+        color: #ffffff;
+        background-color: transparent;
+        border: none;
+        font-size: 12px;
+    }
+    DragDropPanelWidget QSizeGrip {
+        background-color: transparent;
+        border: none;
+    }
+"""
+
 class DragDropPanelWidget(QWidget):
     """
     Custom widget that implements drag and drop functionality for panels.
@@ -13,179 +35,153 @@ class DragDropPanelWidget(QWidget):
     panelMoved = pyqtSignal(object, QPoint)  # Emitted when panel is moved
     panelResized = pyqtSignal(object, QSize)  # Emitted when panel is resized
     
+    # Qt's drag start distance is application-wide, so read it once for all panels
+    _dragThreshold = None
+    
+    # Painting resources shared by all panels
+    _BORDER_PEN = QPen(QColor("#3a3a3a"), 1)
+    _HOVER_PEN = QPen(QColor("#4a4a4a"), 1)
+    _HIGHLIGHT_PEN = QPen(QColor("#007acc"), 2)
+    _DRAG_OPACITY = 0.5
+    
+    # Panels smaller than this (in pixels) drag with the default cursor only
+    _MIN_PREVIEW_AREA = 40000
+    
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setupLogger()
+        self._dragPixmap = None  # Cached drag preview, rebuilt after resize
+        self._dragPixmapSize = None  # Widget size the cached preview was built for
+        self._highlight = False  # Drop zone highlight state
+        self.dragStartPosition = QPoint()
+        if DragDropPanelWidget._dragThreshold is None:
+            DragDropPanelWidget._dragThreshold = QApplication.startDragDistance()
         self.initUI()
         
-    def setupLogger(self):
-        """Initialize logging for the widget"""
-        self.logger = logging.getLogger("DragDropPanelWidget")
-        self.logger.setLevel(logging.INFO)
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-            
     def initUI(self):
         """Initialize the UI components"""
-        try:
-            # Enable dropping
-            self.setAcceptDrops(True)
-            
-            # Main layout
-            self.layout = QVBoxLayout(self)
-            self.layout.setContentsMargins(5, 5, 5, 5)
-            self.layout.setSpacing(0)
-            
-            # Content area
-            self.content = QLabel("Panel Content")
-            self.content.setAlignment(Qt.AlignCenter)
-            self.layout.addWidget(self.content)
-            
-            # Size grip for resizing
-            self.sizeGrip = QSizeGrip(self)
-            self.layout.addWidget(self.sizeGrip, 0, Qt.AlignBottom | Qt.AlignRight)
-            
-            # Set minimum size
-            self.setMinimumSize(100, 100)
-            
-            # Apply styling
-            self.applyStyle()
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing UI: {str(e)}")
-            
-    def applyStyle(self):
-        """Apply custom styling to the widget"""
-        try:
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #2a2a2a;
-                    border: 1px solid #3a3a3a;
-                    border-radius: 4px;
-                }
-                QWidget:hover {
-                    border: 1px solid #4a4a4a;
-                }
-                QLabel {
-                    color: #ffffff;
-                    background-color: transparent;
-                    border: none;
-                    font-size: 12px;
-                }
-                QSizeGrip {
-                    background-color: transparent;
-                    border: none;
-                }
-            """)
-        except Exception as e:
-            self.logger.error(f"Error applying style: {str(e)}")
+        # Enable dropping
+        self.setAcceptDrops(True)
+        
+        # Main layout
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(5, 5, 5, 5)
+        self.layout.setSpacing(0)
+        
+        # Content area
+        self.content = QLabel("Panel Content")
+        self.content.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.content)
+        
+        # Size grip for resizing
+        self.sizeGrip = QSizeGrip(self)
+        self.layout.addWidget(self.sizeGrip, 0, Qt.AlignBottom | Qt.AlignRight)
+        
+        # Set minimum size
+        self.setMinimumSize(100, 100)
+        
+        # Background comes from the application-wide PANEL_STYLESHEET,
+        # hover repaints are needed for the border drawn in paintEvent
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setAttribute(Qt.WA_Hover, True)
             
     def mousePressEvent(self, event):
         """Handle mouse press events to initiate drag operations"""
-        try:
-            if event.button() == Qt.LeftButton:
-                self.dragStartPosition = event.pos()
-        except Exception as e:
-            self.logger.error(f"Error in mouse press event: {str(e)}")
+        if event.button() == Qt.LeftButton:
+            self.dragStartPosition = event.pos()
             
     def mouseMoveEvent(self, event):
         """Handle mouse move events for drag operations"""
+        if not (event.buttons() & Qt.LeftButton):
+            return
+            
+        if (event.pos() - self.dragStartPosition).manhattanLength() < self._dragThreshold:
+            return
+            
         try:
-            if not (event.buttons() & Qt.LeftButton):
-                return
-                
-            if (event.pos() - self.dragStartPosition).manhattanLength() < QApplication.startDragDistance():
-                return
-                
             # Create drag object
             drag = QDrag(self)
             mimeData = QMimeData()
             mimeData.setText("panel")
             drag.setMimeData(mimeData)
             
-            # Create drag pixmap with visual feedback
-            pixmap = QPixmap(self.size())
-            self.render(pixmap)
-            
-            # Add semi-transparent effect
-            painter = QPainter(pixmap)
-            painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
-            painter.fillRect(pixmap.rect(), QColor(0, 0, 0, 127))
-            painter.end()
-            
-            drag.setPixmap(pixmap)
-            drag.setHotSpot(event.pos())
+            # Small panels skip the preview render entirely
+            if self.width() * self.height() >= self._MIN_PREVIEW_AREA:
+                drag.setPixmap(self._getDragPixmap())
+                drag.setHotSpot(event.pos())
             
             # Execute drag operation
             dropAction = drag.exec_(Qt.MoveAction)
             
         except Exception as e:
-            self.logger.error(f"Error in mouse move event: {str(e)}")
+            logger.error(f"Error in mouse move event: {str(e)}")
+            
+    def _getDragPixmap(self):
+        """Return the drag preview pixmap, rendering it only when missing or stale"""
+        if self._dragPixmap is None or self._dragPixmapSize != self.size():
+            # Size the pixmap in device pixels so HiDPI previews stay sharp
+            ratio = self.devicePixelRatioF()
+            pixmap = QPixmap(self.size() * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+            
+            # Render at reduced opacity in a single pass instead of a second
+            # pass over every pixel
+            painter = QPainter(pixmap)
+            painter.setOpacity(self._DRAG_OPACITY)
+            self.render(painter)
+            painter.end()
+            
+            self._dragPixmap = pixmap
+            self._dragPixmapSize = self.size()
+        return self._dragPixmap
             
     def dragEnterEvent(self, event):
         """Handle drag enter events"""
-        try:
-            if event.mimeData().hasText() and event.mimeData().text() == "panel":
-                event.acceptProposedAction()
-                self.highlightDropZone(True)
-            else:
-                event.ignore()
-        except Exception as e:
-            self.logger.error(f"Error in drag enter event: {str(e)}")
+        if event.mimeData().hasText() and event.mimeData().text() == "panel":
+            event.acceptProposedAction()
+            self.highlightDropZone(True)
+        else:
+            event.ignore()
             
     def dragLeaveEvent(self, event):
         """Handle drag leave events"""
-        try:
-            self.highlightDropZone(False)
-            event.accept()
-        except Exception as e:
-            self.logger.error(f"Error in drag leave event: {str(e)}")
+        self.highlightDropZone(False)
+        event.accept()
             
     def dropEvent(self, event):
         """Handle drop events"""
-        try:
-            self.highlightDropZone(False)
-            if event.mimeData().hasText() and event.mimeData().text() == "panel":
-                self.panelMoved.emit(self, event.pos())
-                event.acceptProposedAction()
-            else:
-                event.ignore()
-        except Exception as e:
-            self.logger.error(f"Error in drop event: {str(e)}")
+        self.highlightDropZone(False)
+        if event.mimeData().hasText() and event.mimeData().text() == "panel":
+            self.panelMoved.emit(self, event.pos())
+            event.acceptProposedAction()
+        else:
+            event.ignore()
             
     def highlightDropZone(self, highlight):
         """Toggle drop zone highlighting"""
-        try:
-            if highlight:
-                self.setStyleSheet("""
-                    QWidget {
-                        background-color: #2a2a2a;
-                        border: 2px solid #007acc;
-                        border-radius: 4px;
-                    }
-                    QLabel {
-                        color: #ffffff;
-                        background-color: transparent;
-                        border: none;
-                        font-size: 12px;
-                    }
-                    QSizeGrip {
-                        background-color: transparent;
-                        border: none;
-                    }
-                """)
-            else:
-                self.applyStyle()
-        except Exception as e:
-            self.logger.error(f"Error highlighting drop zone: {str(e)}")
+        if self._highlight == highlight:
+            return
+        self._highlight = highlight
+        self.update()
+            
+    def paintEvent(self, event):
+        """Draw the panel border, highlighted while a drop is hovering"""
+        if self._highlight:
+            pen = self._HIGHLIGHT_PEN
+        elif self.underMouse():
+            pen = self._HOVER_PEN
+        else:
+            pen = self._BORDER_PEN
+            
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(pen)
+        inset = pen.widthF() / 2
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(inset, inset, -inset, -inset), 4, 4)
+        painter.end()
             
     def resizeEvent(self, event):
         """Handle resize events"""
-        try:
-            super().resizeEvent(event)
-            self.panelResized.emit(self, event.size())
-        except Exception as e:
-            self.logger.error(f"Error in resize event: {str(e)}")
+        super().resizeEvent(event)
+        self._dragPixmap = None
+        self.panelResized.emit(self, event.size())
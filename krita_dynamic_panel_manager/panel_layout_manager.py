@@ -1,7 +1,58 @@
 import json
 import os
+import re
 import logging
-from PyQt5.QtCore import QRect, QPoint, QSize
+from PyQt5.QtCore import QRect, QTimer
+
+try:
+    import orjson
+except ImportError:  # Optional, Krita's bundled Python does not ship it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Quiet period before a scheduled autosave is written
+SAVE_DELAY_MS = 500
+
+# Column ids as stored on disk, shared by the schema and the manual checks
+_COLUMN_ID_PATTERN = '^[0-9]+$'
+
+# Schema for the layout file as stored on disk. Pinned to draft-04 because
+# later drafts accept integral floats such as 1.0 as 'integer', which QRect
+# would then reject after validation passed.
+_LAYOUT_SCHEMA = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'type': 'object',
+    'maxProperties': 8,
+    'patternProperties': {
+        _COLUMN_ID_PATTERN: {
+            'type': 'object',
+            'required': ['x', 'y', 'width', 'height', 'visible'],
+            'properties': {
+                'x': {'type': 'integer'},
+                'y': {'type': 'integer'},
+                'width': {'type': 'integer'},
+                'height': {'type': 'integer'},
+                'visible': {'type': 'boolean'}
+            }
+        }
+    },
+    'additionalProperties': False
+}
+
+try:
+    import fastjsonschema
+    _validateSchema = fastjsonschema.compile(_LAYOUT_SCHEMA)
+except ImportError:  # Optional, falls back to the manual checks below
+    _validateSchema = None
+
+
+def _dumps(data):
+    """Serialize layout data to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
 
 class PanelLayoutManager:
     """
@@ -10,19 +61,19 @@ class PanelLayoutManager:
     """
     
     def __init__(self):
-        self.setupLogger()
         self.config_path = self._get_config_path()
         
-    def setupLogger(self):
-        """Initialize logging for the layout manager"""
-        self.logger = logging.getLogger("PanelLayoutManager")
-        self.logger.setLevel(logging.INFO)
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-            
+        # Last loaded layout, keyed by the file's modification time
+        self._cache = None
+        self._cache_mtime = None
+        
+        # Coalesces scheduleSave() bursts into one write
+        self._pending = None
+        self._saveTimer = QTimer()
+        self._saveTimer.setSingleShot(True)
+        self._saveTimer.setInterval(SAVE_DELAY_MS)
+        self._saveTimer.timeout.connect(self._flushSave)
+        
     def _get_config_path(self):
         """Get the path for the configuration file"""
         try:
@@ -31,7 +82,7 @@ class PanelLayoutManager:
             os.makedirs(config_dir, exist_ok=True)
             return os.path.join(config_dir, "panel_layout.json")
         except Exception as e:
-            self.logger.error(f"Error getting config path: {str(e)}")
+            logger.error(f"Error getting config path: {str(e)}")
             return None
             
     def saveLayout(self, panel_columns):
@@ -39,51 +90,114 @@ class PanelLayoutManager:
         Save the current panel layout configuration
         
         Args:
-            panel_columns (dict): Dictionary of panel columns and their configurations
+            panel_columns (list): Panel column widgets in left-to-right order
+        """
+        try:
+            # An explicit save supersedes any queued autosave
+            self._saveTimer.stop()
+            self._pending = None
+            return self._writeLayout(self._snapshotLayout(panel_columns))
+            
+        except Exception as e:
+            logger.error(f"Error saving layout: {str(e)}")
+            return False
+            
+    def scheduleSave(self, panel_columns):
+        """
+        Queue a layout save, coalescing bursts of calls into a single write
+        
+        Args:
+            panel_columns (list): Panel column widgets in left-to-right order
+        """
+        try:
+            # Copy the geometries now so columns deleted before the timer
+            # fires are not touched later
+            self._pending = self._snapshotLayout(panel_columns)
+            self._saveTimer.start()
+        except Exception as e:
+            logger.error(f"Error scheduling layout save: {str(e)}")
+            
+    def _flushSave(self):
+        """Write the layout queued by scheduleSave"""
+        snapshot, self._pending = self._pending, None
+        if snapshot is not None:
+            self._writeLayout(snapshot)
+            
+    def _snapshotLayout(self, panel_columns):
+        """
+        Capture panel geometries as plain tuples
+        
+        Args:
+            panel_columns (list): Panel column widgets in left-to-right order
+            
+        Returns:
+            list: (column_id, x, y, width, height, visible) per column
         """
+        # getRect() returns all four values in one call into Qt
+        return [
+            (column_id, *panel.geometry().getRect(), panel.isVisible())
+            for column_id, panel in enumerate(panel_columns, start=1)
+        ]
+        
+    def _writeLayout(self, snapshot):
+        """Serialize a layout snapshot and write it to the configuration file"""
         try:
             if not self.config_path:
                 raise ValueError("Configuration path not set")
                 
-            layout_data = {}
-            
             # Convert panel data to serializable format
-            for column_id, panel in panel_columns.items():
-                geometry = panel.geometry()
-                layout_data[str(column_id)] = {
-                    'x': geometry.x(),
-                    'y': geometry.y(),
-                    'width': geometry.width(),
-                    'height': geometry.height(),
-                    'visible': panel.isVisible()
+            layout_data = {
+                str(column_id): {
+                    'x': x,
+                    'y': y,
+                    'width': width,
+                    'height': height,
+                    'visible': visible
                 }
+                for column_id, x, y, width, height, visible in snapshot
+            }
                 
-            # Save to file
-            with open(self.config_path, 'w') as f:
-                json.dump(layout_data, f, indent=4)
+            # Write to a temporary file and swap it in so a crash mid-write
+            # never leaves a truncated layout behind
+            tmp_path = self.config_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps(layout_data))
+            os.replace(tmp_path, self.config_path)
+            self._cache = None
                 
-            self.logger.info("Layout saved successfully")
+            logger.info("Layout saved successfully")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error saving layout: {str(e)}")
+            logger.error(f"Error saving layout: {str(e)}")
             return False
             
     def loadLayout(self):
         """
         Load the saved panel layout configuration
         
+        The parsed layout is cached and returned again while the file's
+        modification time is unchanged. Callers must not modify it.
+        
         Returns:
             dict: Layout configuration data or None if loading fails
         """
         try:
             if not self.config_path or not os.path.exists(self.config_path):
-                self.logger.info("No saved layout found, using default")
+                logger.info("No saved layout found, using default")
                 return None
                 
+            mtime = os.stat(self.config_path).st_mtime_ns
+            if self._cache is not None and mtime == self._cache_mtime:
+                return self._cache
+                
             with open(self.config_path, 'r') as f:
                 layout_data = json.load(f)
                 
+            if not self.validateLayout(layout_data):
+                logger.warning("Saved layout is invalid, using default")
+                return None
+                
             # Convert loaded data back to usable format
             converted_layout = {}
             for column_id, data in layout_data.items():
@@ -97,11 +211,14 @@ class PanelLayoutManager:
                     'visible': data['visible']
                 }
                 
-            self.logger.info("Layout loaded successfully")
+            self._cache = converted_layout
+            self._cache_mtime = mtime
+            
+            logger.info("Layout loaded successfully")
             return converted_layout
             
         except Exception as e:
-            self.logger.error(f"Error loading layout: {str(e)}")
+            logger.error(f"Error loading layout: {str(e)}")
             return None
             
     def getDefaultLayout(self):
@@ -120,13 +237,17 @@ class PanelLayoutManager:
                 }
             }
         except Exception as e:
-            self.logger.error(f"Error creating default layout: {str(e)}")
+            logger.error(f"Error creating default layout: {str(e)}")
             return None
             
     def validateLayout(self, layout_data):
         """
         Validate the layout configuration
         
+        Accepts either the raw data read from the layout file (string ids
+        and x/y/width/height fields) or the converted form returned by
+        loadLayout (int ids and QRect geometry).
+        
         Args:
             layout_data (dict): Layout configuration to validate
             
@@ -137,6 +258,9 @@ class PanelLayoutManager:
             if not isinstance(layout_data, dict):
                 return False
                 
+            if any(isinstance(column_id, str) for column_id in layout_data):
+                return self._validateRawLayout(layout_data)
+                
             # Check maximum number of columns
             if len(layout_data) > 8:
                 return False
@@ -159,17 +283,48 @@ class PanelLayoutManager:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error validating layout: {str(e)}")
+            logger.error(f"Error validating layout: {str(e)}")
             return False
             
+    def _validateRawLayout(self, layout_data):
+        """Validate layout data as read from disk against _LAYOUT_SCHEMA"""
+        if _validateSchema is not None:
+            try:
+                _validateSchema(layout_data)
+                return True
+            except fastjsonschema.JsonSchemaException:
+                return False
+                
+        # Same rules as _LAYOUT_SCHEMA when fastjsonschema is not installed
+        if len(layout_data) > 8:
+            return False
+            
+        for column_id, data in layout_data.items():
+            if not isinstance(column_id, str) or not re.search(_COLUMN_ID_PATTERN, column_id):
+                return False
+                
+            if not isinstance(data, dict):
+                return False
+                
+            for key in ('x', 'y', 'width', 'height'):
+                value = data.get(key)
+                if not isinstance(value, int) or isinstance(value, bool):
+                    return False
+                    
+            if not isinstance(data.get('visible'), bool):
+                return False
+                
+        return True
+            
     def clearSavedLayout(self):
         """Delete the saved layout configuration file"""
         try:
             if self.config_path and os.path.exists(self.config_path):
                 os.remove(self.config_path)
-                self.logger.info("Saved layout cleared")
+                self._cache = None
+                logger.info("Saved layout cleared")
                 return True
             return False
         except Exception as e:
-            self.logger.error(f"Error clearing saved layout: {str(e)}")
+            logger.error(f"Error clearing saved layout: {str(e)}")
             return False
@@ -1,7 +1,13 @@
-from krita import Extension
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QMenu, QAction
-from PyQt5.QtCore import Qt, pyqtSignal
+from krita import Extension, Krita
+from PyQt5.QtWidgets import QApplication, QAction, QMenu
+from PyQt5.QtCore import QRect, QTimer
 import logging
+from .panel_layout_manager import PanelLayoutManager
+
+logger = logging.getLogger(__name__)
+
+# Lets repeated setup() calls find the menu added earlier
+MENU_OBJECT_NAME = "panelManagerMenu"
 
 class PanelManagerExtension(Extension):
     """
@@ -11,17 +17,20 @@ class PanelManagerExtension(Extension):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.panel_columns = {}  # Dictionary to track panel columns
-        self.setupLogger()
-        
-    def setupLogger(self):
-        """Initialize logging for the extension"""
-        self.logger = logging.getLogger("PanelManagerExtension")
-        self.logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        self.panel_columns = []  # Panel columns in left-to-right order
+        self._pendingLayout = False  # Set while a deferred layout pass is queued
+        self.layout_manager = None  # Created in setup()
+        self._actionsCreated = False  # Menu actions are built once and reused
+
+    def setupLogging(self):
+        """Attach a single handler to the plugin's package logger"""
+        package_logger = logging.getLogger(__package__)
+        package_logger.setLevel(logging.INFO)
+        if not package_logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            package_logger.addHandler(handler)
 
     def setup(self):
         """
@@ -29,13 +38,20 @@ class PanelManagerExtension(Extension):
         Registers actions and initializes the panel system.
         """
         try:
-            self.logger.info("Setting up Krita Dynamic Panel Manager")
+            self.setupLogging()
+            logger.info("Setting up Krita Dynamic Panel Manager")
             
             # Register actions in Krita's menu
             if not Krita.instance():
-                self.logger.error("Failed to get Krita instance")
+                logger.error("Failed to get Krita instance")
                 return
 
+            # Layout persistence, autosaved as panels move and resize
+            self.layout_manager = PanelLayoutManager()
+
+            # Install the shared panel stylesheet
+            self.installStyleSheet()
+
             # Create and register menu actions
             self.registerMenuActions()
             
@@ -43,34 +59,58 @@ class PanelManagerExtension(Extension):
             self.createDefaultLayout()
             
         except Exception as e:
-            self.logger.error(f"Error during setup: {str(e)}")
+            logger.error(f"Error during setup: {str(e)}")
+
+    def installStyleSheet(self):
+        """Install the panel stylesheet once on the application"""
+        try:
+            from .drag_drop_panel_widget import PANEL_STYLESHEET
+
+            app = QApplication.instance()
+            if not app:
+                return
+
+            # Append to Krita's own sheet rather than replacing it
+            current = app.styleSheet()
+            if PANEL_STYLESHEET not in current:
+                app.setStyleSheet(current + PANEL_STYLESHEET)
+                
+        except Exception as e:
+            logger.error(f"Error installing stylesheet: {str(e)}")
 
     def registerMenuActions(self):
-        """Register menu actions for the plugin"""
+        """Register menu actions for the plugin, reusing them on repeated setup"""
         try:
-            # Add Panel action
-            self.addPanelAction = QAction("Add Panel Column", self.parent())
-            self.addPanelAction.triggered.connect(self.addPanelColumn)
-            
-            # Remove Panel action
-            self.removePanelAction = QAction("Remove Panel Column", self.parent())
-            self.removePanelAction.triggered.connect(self.removePanelColumn)
-            
-            # Reset Layout action
-            self.resetLayoutAction = QAction("Reset Layout", self.parent())
-            self.resetLayoutAction.triggered.connect(self.resetLayout)
-            
-            # Add actions to Krita's View menu
+            if not self._actionsCreated:
+                # Add Panel action
+                self.addPanelAction = QAction("Add Panel Column", self.parent())
+                self.addPanelAction.triggered.connect(self.addPanelColumn)
+                
+                # Remove Panel action; triggered's checked flag must not be
+                # taken as a column id
+                self.removePanelAction = QAction("Remove Panel Column", self.parent())
+                self.removePanelAction.triggered.connect(lambda: self.removePanelColumn())
+                
+                # Reset Layout action
+                self.resetLayoutAction = QAction("Reset Layout", self.parent())
+                self.resetLayoutAction.triggered.connect(self.resetLayout)
+                
+                self._actionsCreated = True
+                
+            # Add actions to Krita's menu bar, once per window
             window = Krita.instance().activeWindow()
             if window:
-                menu = window.qwindow().menuBar().addMenu("Panel Manager")
-                menu.addAction(self.addPanelAction)
-                menu.addAction(self.removePanelAction)
-                menu.addSeparator()
-                menu.addAction(self.resetLayoutAction)
+                menu_bar = window.qwindow().menuBar()
+                if menu_bar.findChild(QMenu, MENU_OBJECT_NAME) is None:
+                    menu = menu_bar.addMenu("Panel Manager")
+                    menu.setObjectName(MENU_OBJECT_NAME)
+                    menu.addAction(self.addPanelAction)
+                    menu.addAction(self.removePanelAction)
+                    menu.addSeparator()
+                    menu.addAction(self.resetLayoutAction)
                 
         except Exception as e:
-            self.logger.error(f"Error registering menu actions: {str(e)}")
+            logger.error(f"Error registering menu actions: {str(e)}")
 
     def createDefaultLayout(self):
         """Create the default panel layout with one column"""
@@ -78,56 +118,80 @@ class PanelManagerExtension(Extension):
             # Create initial panel column
             self.addPanelColumn()
         except Exception as e:
-            self.logger.error(f"Error creating default layout: {str(e)}")
+            logger.error(f"Error creating default layout: {str(e)}")
 
     def addPanelColumn(self):
         """Add a new panel column if under the limit"""
         try:
             if len(self.panel_columns) >= 8:
-                self.logger.warning("Maximum number of panel columns (8) reached")
+                logger.warning("Maximum number of panel columns (8) reached")
                 return False
                 
-            column_id = len(self.panel_columns) + 1
             from .drag_drop_panel_widget import DragDropPanelWidget
             
             new_column = DragDropPanelWidget(parent=self.parent())
-            self.panel_columns[column_id] = new_column
+            new_column.panelResized.connect(self.scheduleLayoutSave)
+            new_column.panelMoved.connect(self.scheduleLayoutSave)
+            self.panel_columns.append(new_column)
+            column_id = len(self.panel_columns)
             
             # Position the new column
             self.updateColumnPositions()
             
-            self.logger.info(f"Added new panel column {column_id}")
+            logger.info(f"Added new panel column {column_id}")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error adding panel column: {str(e)}")
+            logger.error(f"Error adding panel column: {str(e)}")
             return False
 
+    def scheduleLayoutSave(self, *args):
+        """Queue an autosave of the current layout"""
+        if self.layout_manager:
+            self.layout_manager.scheduleSave(self.panel_columns)
+
     def removePanelColumn(self, column_id=None):
-        """Remove the specified panel column or the last one if not specified"""
+        """
+        Remove the specified panel column or the last one if not specified
+        
+        Args:
+            column_id (int): 1-based position of the column to remove
+        """
         try:
             if not self.panel_columns:
-                self.logger.warning("No panel columns to remove")
+                logger.warning("No panel columns to remove")
                 return False
                 
             if column_id is None:
-                column_id = max(self.panel_columns.keys())
+                column_id = len(self.panel_columns)
                 
-            if column_id in self.panel_columns:
-                column = self.panel_columns.pop(column_id)
+            if 1 <= column_id <= len(self.panel_columns):
+                column = self.panel_columns.pop(column_id - 1)
                 column.deleteLater()
                 self.updateColumnPositions()
-                self.logger.info(f"Removed panel column {column_id}")
+                logger.info(f"Removed panel column {column_id}")
                 return True
             else:
-                self.logger.warning(f"Panel column {column_id} not found")
+                logger.warning(f"Panel column {column_id} not found")
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Error removing panel column: {str(e)}")
+            logger.error(f"Error removing panel column: {str(e)}")
             return False
 
     def updateColumnPositions(self):
+        """Schedule a column layout pass, coalescing repeated requests into one"""
+        if self._pendingLayout:
+            return
+        self._pendingLayout = True
+        QTimer.singleShot(0, self._flushLayout)
+
+    def _flushLayout(self):
+        """Run the queued column layout pass"""
+        self._pendingLayout = False
+        self._doUpdateColumnPositions()
+
+    def _doUpdateColumnPositions(self):
         """Update the positions of all panel columns"""
         try:
             window = Krita.instance().activeWindow()
@@ -140,27 +204,46 @@ class PanelManagerExtension(Extension):
             # Calculate column width based on number of columns
             column_width = screen_width // max(len(self.panel_columns), 1)
             
-            # Position each column
-            for idx, column in self.panel_columns.items():
-                x_pos = (idx - 1) * column_width
-                column.setGeometry(x_pos, 0, column_width, main_window.height())
+            column_height = main_window.height()
+            
+            # Columns already in place are skipped so they do not get
+            # spurious move/resize events and panelResized emissions
+            changed = []
+            for idx, column in enumerate(self.panel_columns):
+                target = QRect(idx * column_width, 0, column_width, column_height)
+                if column.geometry() != target:
+                    changed.append((column, target))
+                    
+            # Nothing moved, so avoid the full-window repaint below
+            if not changed:
+                return
+                
+            # Position the columns with repaints suspended so the window is
+            # redrawn once after the whole batch rather than once per column
+            main_window.setUpdatesEnabled(False)
+            try:
+                for column, target in changed:
+                    column.setGeometry(target)
+            finally:
+                # Re-enabling updates schedules a single repaint of the window
+                main_window.setUpdatesEnabled(True)
                 
         except Exception as e:
-            self.logger.error(f"Error updating column positions: {str(e)}")
+            logger.error(f"Error updating column positions: {str(e)}")
 
     def resetLayout(self):
         """Reset to default layout with one panel column"""
         try:
             # Remove all existing columns
-            for column_id in list(self.panel_columns.keys()):
-                self.removePanelColumn(column_id)
+            while self.panel_columns:
+                self.removePanelColumn()
                 
             # Create default layout
             self.createDefaultLayout()
-            self.logger.info("Layout reset to default")
+            logger.info("Layout reset to default")
             
         except Exception as e:
-            self.logger.error(f"Error resetting layout: {str(e)}")
+            logger.error(f"Error resetting layout: {str(e)}")
 
     def canvasChanged(self, canvas):
         """Handle canvas change events"""
@@ -168,4 +251,4 @@ class PanelManagerExtension(Extension):
             if canvas:
                 self.updateColumnPositions()
         except Exception as e:
-            self.logger.error(f"Error handling canvas change: {str(e)}")
+            logger.error(f"Error handling canvas change: {str(e)}")